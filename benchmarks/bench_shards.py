@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Check that a sharded comparison gives the same reports of a single run.
+
+The JPLAG run of each shard is simulated by taking, from the results of the
+synthetic corpus, the comparisons between the sources in the shard. Each
+shard is reduced by a separate `shard partial` process, then the partial
+results are merged with `shard merge`. The merged reports must be
+byte-identical to the ones written by `report` on all the results.
+
+Usage:
+  bench_shards.py [-g NGROUPS] [-n NSUBS] [-b BLOCK_SIZE]
+"""
+import os
+import sys
+import time
+import pathlib
+import zipfile
+import argparse
+import tempfile
+import subprocess
+
+from corpus import make_corpus
+
+ROOTDIR = pathlib.Path(__file__).resolve().parent.parent
+
+REPORT_SUFFIXES = ('_report.csv', '_clusters_report.csv')
+
+
+def run(argv):
+    env = dict(os.environ, PYTHONPATH=str(ROOTDIR))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-m', 'cms_check_plagiarism'] +
+                          argv,
+                          env=env,
+                          capture_output=True,
+                          text=True,
+                          check=True)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, proc.stdout
+
+
+def gid_of(source_name):
+    return source_name.split('_')[0][len('sub'):]
+
+
+# write the JPLAG results that a run on shard_dir would give
+def simulate_jplag(results, shard_dir, basename):
+    gids = set(d.name for d in shard_dir.iterdir())
+
+    with zipfile.ZipFile(results.with_suffix('.zip'), 'r') as zip_ref, \
+            zipfile.ZipFile(basename.with_suffix('.zip'), 'w') as shard_ref:
+        for name in zip_ref.namelist():
+            if name == 'overview.json':
+                shard_ref.writestr(name, zip_ref.read(name))
+                continue
+
+            source1, source2 = name[:-len('.json')].split('-')
+            if gid_of(source1) in gids and gid_of(source2) in gids:
+                shard_ref.writestr(name, zip_ref.read(name))
+
+    basename.with_suffix('.log').write_text(
+        results.with_suffix('.log').read_text())
+
+
+# parse CLI args with argparse
+def cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-g', '--groups',
+                        type=int,
+                        default=40,
+                        help="Number of groups [default: 40].")
+    parser.add_argument('-n', '--nsubs',
+                        type=int,
+                        default=3,
+                        help="Number of submissions per group [default: 3].")
+    parser.add_argument('-b', '--block-size',
+                        type=int,
+                        default=10,
+                        help="Number of groups in each block [default: 10].")
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == '__main__':
+    args = cli_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        corpusdir = tmpdir / 'corpus'
+        make_corpus(corpusdir, args.groups, args.nsubs)
+        results = corpusdir / 'jplag_all_src'
+
+        single_time, _ = run(['report', '-s', '0.5',
+                              str(results.with_suffix('.log')),
+                              str(results.with_suffix('.zip'))])
+
+        _, stdout = run(['shard', 'plan', '-b', str(args.block_size),
+                         str(corpusdir / 'allsrc'), str(tmpdir / 'shards')])
+        shard_dirs = [pathlib.Path(line) for line in stdout.splitlines()]
+
+        partials = []
+        shards_time = 0.0
+        for shard_dir in shard_dirs:
+            basename = shard_dir.with_name(shard_dir.name + '_jplag')
+            simulate_jplag(results, shard_dir, basename)
+
+            partial = shard_dir.with_name(shard_dir.name + '_partial')
+            elapsed, _ = run(['shard', 'partial',
+                              str(basename.with_suffix('.log')),
+                              str(basename.with_suffix('.zip')),
+                              str(partial)])
+            shards_time += elapsed
+            partials.append(str(partial))
+
+        merged = tmpdir / 'merged'
+        merge_time, _ = run(['shard', 'merge', '-s', '0.5',
+                             '-o', str(merged)] + partials)
+
+        identical = True
+        for suffix in REPORT_SUFFIXES:
+            single_report = results.with_name(results.name + suffix)
+            merged_report = merged.with_name(merged.name + suffix)
+            if single_report.read_bytes() != merged_report.read_bytes():
+                print('differ: {}'.format(suffix))
+                identical = False
+
+    print('shards: {}'.format(len(shard_dirs)))
+    print('single run: {:.3f}s, shards: {:.3f}s, merge: {:.3f}s'
+          .format(single_time, shards_time, merge_time))
+    print('identical: {}'.format(identical))
+
+    exit(0 if identical else 1)
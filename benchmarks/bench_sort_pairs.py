@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Measure time and memory of `sort-pairs` on a synthetic allpairs.rb output.
+
+Most pairs have a similarity close to zero, like on a real contest. The
+sorted report is compared with the one of `sort -n -r` (with LC_ALL=C) on
+the pairs above the floor.
+
+Usage:
+  bench_sort_pairs.py [-p NPAIRS] [-f FLOOR] [-m MEMORY]
+"""
+import os
+import sys
+import time
+import random
+import pathlib
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOTDIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+def pairs(npairs, seed=42):
+    rnd = random.Random(seed)
+    for n in range(npairs):
+        gid1, gid2 = rnd.randrange(1000), rnd.randrange(1000)
+        sim = int(rnd.expovariate(1.0))
+        if sim == 0 and rnd.random() < 0.5:
+            # pair with no match
+            yield ' {} {}\n'.format(gid1, gid2)
+        else:
+            yield ('{}% {}/sub{}_1_0.0_.cpp {}/sub{}_2_0.0_.cpp: {} {}\n'
+                   .format(sim, gid1, gid1, gid2, gid2, gid1, gid2))
+
+
+# parse CLI args with argparse
+def cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-p', '--pairs',
+                        type=int,
+                        default=1000000,
+                        help="Number of pairs [default: 1000000].")
+    parser.add_argument('-f', '--floor',
+                        type=float,
+                        default=1.0,
+                        help="Similarity floor [default: 1].")
+    parser.add_argument('-m', '--memory',
+                        type=int,
+                        default=4,
+                        help="Memory budget in MiB [default: 4].")
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == '__main__':
+    args = cli_args()
+
+    sys.path.insert(0, str(ROOTDIR))
+    from cms_check_plagiarism.sherlock import parse_similarity
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        pairs_file = tmpdir / 'allpairs.out'
+        with pairs_file.open('w') as pairsfp:
+            pairsfp.writelines(pairs(args.pairs))
+
+        report = tmpdir / 'report.txt'
+        env = dict(os.environ, PYTHONPATH=str(ROOTDIR))
+        start = time.perf_counter()
+        with pairs_file.open('r') as pairsfp:
+            subprocess.run([sys.executable, '-m', 'cms_check_plagiarism',
+                            'sort-pairs',
+                            '-f', str(args.floor),
+                            '-m', str(args.memory),
+                            '-T', str(tmpdir),
+                            '-o', str(report)],
+                           stdin=pairsfp,
+                           env=env,
+                           check=True)
+        elapsed = time.perf_counter() - start
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+        filtered = tmpdir / 'filtered.txt'
+        with pairs_file.open('r') as pairsfp, filtered.open('w') as outfp:
+            outfp.writelines(line for line in pairsfp
+                             if parse_similarity(line) >= args.floor)
+        expected = subprocess.run(['sort', '-n', '-r', str(filtered)],
+                                  env=dict(os.environ, LC_ALL='C'),
+                                  capture_output=True,
+                                  check=True).stdout
+
+        identical = report.read_bytes() == expected
+        input_size = pairs_file.stat().st_size
+        report_size = report.stat().st_size
+
+    print('pairs: {}, input: {:.1f} MiB, report: {:.1f} MiB'
+          .format(args.pairs, input_size/2**20, report_size/2**20))
+    print('time: {:.3f}s, max RSS: {:.1f} MiB'
+          .format(elapsed, maxrss/1024))
+    print('identical to sort -n -r: {}'.format(identical))
+
+    exit(0 if identical else 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure the startup cost of the cms_check_plagiarism subcommands.
+
+The same jobs are run once as one process per job and once from a single
+`batch` process. Both runs use `python3 -X importtime`, the import time is
+the sum of the "self" column reported by the interpreter.
+
+Usage:
+  bench_startup.py [-g NGROUPS] [-n NSUBS]
+"""
+import os
+import sys
+import time
+import shlex
+import pathlib
+import argparse
+import tempfile
+import subprocess
+
+from corpus import make_corpus
+
+ROOTDIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+def import_time_us(stderr):
+    total = 0
+    for line in stderr.splitlines():
+        if line.startswith('import time:'):
+            fields = line[len('import time:'):].split('|')
+            if fields[0].strip().isdigit():
+                total += int(fields[0])
+
+    return total
+
+
+def run(argv, stdin=None):
+    env = dict(os.environ, PYTHONPATH=str(ROOTDIR))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime',
+                           '-m', 'cms_check_plagiarism'] + argv,
+                          input=stdin,
+                          env=env,
+                          capture_output=True,
+                          text=True,
+                          check=True)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, import_time_us(proc.stderr)
+
+
+def make_jobs(corpusdir, names):
+    jobs = []
+    for gid in names:
+        jobs.append(['cluster',
+                     str(corpusdir / 'jplag_logs' / 'jplag_{}.log'.format(gid)),
+                     str(corpusdir / 'allsrc' / str(gid))])
+    jobs.append(['report',
+                 str(corpusdir / 'jplag_all_src.log'),
+                 str(corpusdir / 'jplag_all_src.zip')])
+    jobs.append(['report', '-g',
+                 str(corpusdir / 'jplag_clustered_by_group.log'),
+                 str(corpusdir / 'jplag_clustered_by_group.zip')])
+    jobs.append(['list-groups', str(corpusdir / 'jplag_report.txt')])
+
+    return jobs
+
+
+# parse CLI args with argparse
+def cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-g', '--groups',
+                        type=int,
+                        default=50,
+                        help="Number of groups [default: 50].")
+    parser.add_argument('-n', '--nsubs',
+                        type=int,
+                        default=2,
+                        help="Number of submissions per group [default: 2].")
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == '__main__':
+    args = cli_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        corpusdir = pathlib.Path(tmpdir)
+        names = make_corpus(corpusdir, args.groups, args.nsubs)
+        jobs = make_jobs(corpusdir, names)
+
+        single_time = 0.0
+        single_imports = 0
+        for job in jobs:
+            elapsed, imports = run(job)
+            single_time += elapsed
+            single_imports += imports
+
+        batch_stdin = ''.join(shlex.join(job) + '\n' for job in jobs)
+        batch_time, batch_imports = run(['batch'], stdin=batch_stdin)
+
+    njobs = len(jobs)
+    print('jobs: {}'.format(njobs))
+    print('{:<12} {:>12} {:>16} {:>16}'
+          .format('mode', 'wall (s)', 'imports (ms)', 'imports/job (ms)'))
+    for mode, elapsed, imports in (('per-process', single_time,
+                                    single_imports),
+                                   ('batch', batch_time, batch_imports)):
+        print('{:<12} {:>12.3f} {:>16.1f} {:>16.2f}'
+              .format(mode, elapsed, imports/1000, imports/1000/njobs))
+
+    exit(0)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic corpus shaped like the outputs of JPLAG on `allsrc`.
+
+The corpus contains:
+  * allsrc/<gid>/sub<gid>_<nsub>_<score>_.cpp    source files
+  * jplag_all_src.{log,zip}                       single subs results
+                                                  (with --cluster-skip)
+  * jplag_clustered_by_group.{log,zip}            grouped results
+  * jplag_logs/jplag_<gid>.log                    per group clustering logs
+  * jplag_report.txt                              old style JPLAG report
+
+Usage:
+  corpus.py [-g NGROUPS] [-n NSUBS] [--seed SEED] OUTDIR
+"""
+import json
+import random
+import pathlib
+import zipfile
+import argparse
+import itertools
+
+LOG_PREFIX = '2023-01-01 00:00:00,000 [main] [INFO] ClusteringFactory - '
+
+
+def source_names(ngroups, nsubs, rnd):
+    names = {}
+    for gid in range(1, ngroups+1):
+        names[gid] = ['sub{}_{}_{}_.cpp'
+                      .format(gid, nsub, rnd.choice([0.0, 30.0, 100.0]))
+                      for nsub in range(1, nsubs+1)]
+
+    return names
+
+
+def cluster_lines(clusters):
+    lines = [LOG_PREFIX + '{} clusters were found:'.format(len(clusters))]
+    for strength, avg_similarity, members in clusters:
+        lines.append(LOG_PREFIX +
+                     ' cluster strength: {}, avg similarity: {}%, '
+                     'members: [{}]'
+                     .format(strength, avg_similarity, ', '.join(members)))
+
+    return lines
+
+
+def write_results(basename, comparisons, clusters=None):
+    with zipfile.ZipFile(basename.with_suffix('.zip'), 'w') as zip_ref:
+        zip_ref.writestr('overview.json', json.dumps({}))
+        for name, similarity in comparisons:
+            zip_ref.writestr(name, json.dumps({'similarity': similarity}))
+
+    # no clusters are logged with --cluster-skip
+    with basename.with_suffix('.log').open('w') as logfp:
+        if clusters is not None:
+            for line in cluster_lines(clusters):
+                logfp.write(line + '\n')
+
+
+def make_corpus(outdir, ngroups=20, nsubs=3, seed=42):
+    rnd = random.Random(seed)
+    outdir = pathlib.Path(outdir)
+    names = source_names(ngroups, nsubs, rnd)
+
+    for gid, gnames in names.items():
+        gdir = outdir / 'allsrc' / str(gid)
+        gdir.mkdir(parents=True, exist_ok=True)
+        for name in gnames:
+            (gdir / name).write_text('int main() {{ return {}; }}\n'
+                                     .format(gid))
+
+    all_names = [name for gid in names for name in names[gid]]
+
+    comparisons = []
+    report_lines = []
+    for name1, name2 in itertools.combinations(all_names, 2):
+        # few distinct values, so that there are ties between comparisons
+        similarity = round(rnd.random(), 2)
+        comparisons.append(('{}-{}.json'.format(name1, name2), similarity))
+        report_lines.append('Comparing {}-{}: {}'
+                            .format(name1, name2, similarity*100))
+    write_results(outdir / 'jplag_all_src', comparisons)
+
+    group_comparisons = []
+    for gid1, gid2 in itertools.combinations(names, 2):
+        group_comparisons.append(('{}-{}.json'.format(gid1, gid2),
+                                  round(rnd.random(), 6)))
+    group_clusters = [(round(rnd.random(), 6),
+                       round(rnd.random(), 6),
+                       [str(g) for g in rnd.sample(list(names), 2)])
+                      for _ in range(ngroups // 4)]
+    write_results(outdir / 'jplag_clustered_by_group',
+                  group_comparisons, group_clusters)
+
+    (outdir / 'jplag_logs').mkdir(exist_ok=True)
+    for gid, gnames in names.items():
+        with (outdir / 'jplag_logs' / 'jplag_{}.log'.format(gid)) \
+                .open('w') as logfp:
+            lines = cluster_lines([(0.5, rnd.choice([0.5, 0.95]),
+                                    gnames[:2])])
+            for line in lines:
+                logfp.write(line + '\n')
+
+    with (outdir / 'jplag_report.txt').open('w') as reportfp:
+        for line in report_lines:
+            reportfp.write(line + '\n')
+
+    return names
+
+
+# parse CLI args with argparse
+def cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('OUTDIR',
+                        type=pathlib.Path,
+                        help="Output directory.")
+    parser.add_argument('-g', '--groups',
+                        type=int,
+                        default=20,
+                        help="Number of groups [default: 20].")
+    parser.add_argument('-n', '--nsubs',
+                        type=int,
+                        default=3,
+                        help="Number of submissions per group [default: 3].")
+    parser.add_argument('--seed',
+                        type=int,
+                        default=42,
+                        help="Random seed [default: 42].")
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == '__main__':
+    args = cli_args()
+    make_corpus(args.OUTDIR, args.groups, args.nsubs, args.seed)
+
+    exit(0)
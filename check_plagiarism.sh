@@ -25,6 +25,9 @@ jplag=false
 sherlock=false
 verbose=false
 jexec=false
+shard_size=false
+sherlock_floor=false
+sherlock_gzip=false
 SHERLOCK_DEFAULT_BIN="$(command -v sherlock)"
 JAVA_DEFAULT_EXEC="$(command -v java)"
 JPLAG_DEFAULT_JAR="/opt/jplag/jplag.jar"
@@ -34,6 +37,9 @@ Usage:
   check_plagiarism.sh [options] [ --jexec JAVA_EXEC ]
                                 [ --jplag JPLAG_JAR ]
                                 [ --sherlock SHERLOCK_BIN ]
+                                [ --shard-size SHARD_SIZE ]
+                                [ --sherlock-floor SHERLOCK_FLOOR ]
+                                [ --sherlock-gzip ]
   check_plagiarism.sh ( -h | --help | --man )
   check_plagiarism.sh ( --version )
 
@@ -46,7 +52,14 @@ Usage:
                                   [default: /opt/jplag/jplag.jar]
     --sherlock SHERLOCK_BIN       Path to sherlock's binary
                                   [default: $SHERLOCK_DEFAULT_BIN]
+    --sherlock-floor SHERLOCK_FLOOR
+                                  Drop Sherlock pairs with a similarity
+                                  below SHERLOCK_FLOOR [default: 1]
+    --sherlock-gzip               Compress the Sherlock report with gzip.
     --man                         Show an extended help message.
+    --shard-size SHARD_SIZE       Compare all sources (step 2.a) in
+                                  independent jobs, each one with two blocks
+                                  of SHARD_SIZE participants.
     -v, --verbose                 Generate verbose output.
     --version                     Print version and copyright information.
 ----
@@ -158,7 +171,18 @@ if [ -n "$sherlock" ]; then
   SHERLOCK_BIN="$sherlock"
 fi
 
+SHERLOCK_FLOOR=1
+if [ -n "$sherlock_floor" ] && [ "$sherlock_floor" != false ]; then
+  SHERLOCK_FLOOR="$sherlock_floor"
+fi
+
+SHERLOCK_REPORT="plagiarism_report.sherlock.txt"
+if $sherlock_gzip; then
+  SHERLOCK_REPORT="plagiarism_report.sherlock.txt.gz"
+fi
+
 echodebug "SHERLOCK_BIN: $SHERLOCK_BIN"
+echodebug "SHERLOCK_FLOOR: $SHERLOCK_FLOOR"
 echodebug "JAVA_EXEC: $JAVA_EXEC"
 echodebug "JPLAG_JAR: $JPLAG_JAR"
 
@@ -174,6 +198,13 @@ echodebug "SOURCEDIR: $SOURCEDIR"
 SCRIPTDIR="$SOURCEDIR/scripts"
 echodebug "SCRIPTDIR: $SCRIPTDIR"
 
+# run the python helpers, use the batch subcommand to run many of them from
+# a single interpreter (see: python3 -m cms_check_plagiarism --help)
+function cms_check_plagiarism() {
+  PYTHONPATH="$SOURCEDIR${PYTHONPATH:+:$PYTHONPATH}" \
+    python3 -m cms_check_plagiarism "$@"
+}
+
 resdir=$(mktemp -d -p "$SOURCEDIR" -t check_plagiarism.results.XXX)
 echoverbose "Checking plagiarism, saving results in $resdir/..."
 
@@ -185,29 +216,90 @@ fi
 
 echoverbose -n "  * step 1: checking all pairs with Sherlock..."
 
+# pairs below the floor are dropped, the others are sorted by similarity
+# spilling sorted runs in $resdir when they do not fit in memory
 ( cd "$SOURCEDIR/allsrc/"
-  "$SCRIPTDIR/allpairs.rb" | sort -n -r > "$resdir/allpairs.out"
+  "$SCRIPTDIR/allpairs.rb" | \
+    cms_check_plagiarism sort-pairs \
+      -f "$SHERLOCK_FLOOR" \
+      -T "$resdir" \
+      -o "$resdir/$SHERLOCK_REPORT"
 )
-cp "$resdir/allpairs.out" "$resdir/plagiarism_report.sherlock.txt"
 if $verbose; then
-  echo " done -> $resdir/plagiarism_report.sherlock.txt"
+  echo " done -> $resdir/$SHERLOCK_REPORT"
 fi
 
+function jplag_all_src() {
+  local sources="$1"
+  local results="$2"
+
+  set +eo pipefail
+  "$JAVA_EXEC" -jar "$JPLAG_JAR" \
+    -l 'cpp' \
+    --cluster-skip \
+    -n -1 \
+    -m 0.8 \
+    -r "$results" \
+    "$sources" \
+      > "$results.log"
+  set -eo pipefail
+}
+
 echoverbose "  * step 2: checking with Jplag:"
 echoverbose -n "    * 2.a: Check all sources (by group) with JPLAG ..."
-set +eo pipefail
-"$JAVA_EXEC" -jar "$JPLAG_JAR" \
-  -l 'cpp' \
-  --cluster-skip \
-  -n -1 \
-  -m 0.8 \
-  -r "$resdir/jplag_all_src" \
-  "$SOURCEDIR/allsrc" \
-    > "$resdir/jplag_all_src.log"
-set -eo pipefail
-"$SCRIPTDIR"/report_jplag.py \
-  "$resdir/jplag_all_src.log" \
-  "$resdir/jplag_all_src.zip"
+if [ -n "$shard_size" ] && [ "$shard_size" != false ]; then
+  # each shard is an independent job: it can be run on a different machine,
+  # as long as its partial results (.log and .zip) are copied back.
+  # Shard directories link to the sources in allsrc, copy them dereferencing
+  # the links (cp -L, rsync -L) or plan them with --copy.
+  mkdir -p "$resdir/jplag_all_src_shards"
+  : > "$resdir/jplag_all_src_shards/partial_jobs.txt"
+  mapfile -t shards < <( cms_check_plagiarism shard plan \
+                           -b "$shard_size" \
+                           "$SOURCEDIR/allsrc" \
+                           "$resdir/jplag_all_src_shards/src" )
+  if [ "${#shards[@]}" -eq 0 ]; then
+    (>&2 echo "Error: no participants in '$SOURCEDIR/allsrc/'")
+    exit 1
+  fi
+
+  partials=()
+  for ashard in "${shards[@]}"; do
+    shardname=$(basename "$ashard")
+    echodebug "shard: $shardname"
+
+    jplag_all_src "$ashard" "$resdir/jplag_all_src_shards/jplag_$shardname"
+    printf 'shard partial %q %q %q\n' \
+      "$resdir/jplag_all_src_shards/jplag_$shardname.log" \
+      "$resdir/jplag_all_src_shards/jplag_$shardname.zip" \
+      "$resdir/jplag_all_src_shards/partial_$shardname" \
+        >> "$resdir/jplag_all_src_shards/partial_jobs.txt"
+    partials+=("$resdir/jplag_all_src_shards/partial_$shardname")
+  done
+  # the merge needs all the partial results
+  partial_status=0
+  cms_check_plagiarism batch \
+    < "$resdir/jplag_all_src_shards/partial_jobs.txt" || partial_status=$?
+  if [ "$partial_status" -ne 0 ]; then
+    (>&2 echo "Error: step 2.a failed, some shards have no partial results" \
+              "(see $resdir/jplag_all_src_shards/)")
+    exit "$partial_status"
+  fi
+
+  # reports are written at the end (step 3) with the other ones
+  { printf 'shard merge -o %q' "$resdir/jplag_all_src"
+    printf ' %q' "${partials[@]}"
+    printf '\n'
+  } >> "$resdir/report_jobs.txt"
+else
+  jplag_all_src "$SOURCEDIR/allsrc" "$resdir/jplag_all_src"
+
+  # reports are written at the end (step 3) with the other ones
+  printf 'report %q %q\n' \
+    "$resdir/jplag_all_src.log" \
+    "$resdir/jplag_all_src.zip" \
+      >> "$resdir/report_jobs.txt"
+fi
 if $verbose; then
   echo "  done"
 fi
@@ -218,6 +310,7 @@ echoverbose "        - 2.b.1: Clustering sources with JPLAG ..."
 mkdir -p "$resdir/jplag_logs"
 mkdir -p "$resdir/jplag_clustered_by_group_src"
 mkdir -p "$resdir/jplag_clustered_all_src"
+: > "$resdir/jplag_logs/cluster_jobs.txt"
 find "$SOURCEDIR/allsrc" -mindepth 1 -type d -print0 | sort -V -z | \
   while IFS= read -r -d '' asourcedir; do
     dirname=$(basename "$asourcedir")
@@ -236,17 +329,24 @@ find "$SOURCEDIR/allsrc" -mindepth 1 -type d -print0 | sort -V -z | \
     set -eo pipefail
 
     mkdir -p "$resdir/jplag_clustered_by_group_src/$dirname"
-    # Reading output of a command into an array in Bash
-    #   https://stackoverflow.com/a/32931403/2377454
-    mapfile -t sources < <( "$SCRIPTDIR"/clustering_jplag.py \
-                              "$resdir/jplag_logs/jplag_$dirname.log" \
-                              "$SOURCEDIR/allsrc/$dirname")
-    for asource in "${sources[@]}"; do
-      # echo "asource: $asource"
-      cp "$asource" "$resdir/jplag_clustered_by_group_src/$dirname"
-      cp "$asource" "$resdir/jplag_clustered_all_src"
-    done
+    printf 'cluster %q %q\n' \
+      "$resdir/jplag_logs/jplag_$dirname.log" \
+      "$SOURCEDIR/allsrc/$dirname" \
+        >> "$resdir/jplag_logs/cluster_jobs.txt"
+done
+
+# selected sources are listed with their full path, the group is the name of
+# the parent directory. A failed job is reported by batch, the sources of
+# the other participants are still copied.
+set +eo pipefail
+cms_check_plagiarism batch < "$resdir/jplag_logs/cluster_jobs.txt" | \
+  while IFS= read -r asource; do
+    # echo "asource: $asource"
+    dirname=$(basename "$(dirname "$asource")")
+    cp "$asource" "$resdir/jplag_clustered_by_group_src/$dirname"
+    cp "$asource" "$resdir/jplag_clustered_all_src"
 done
+set -eo pipefail
 if $verbose; then
   echo "  done"
 fi
@@ -261,9 +361,10 @@ set +eo pipefail
     "$resdir/jplag_clustered_by_group_src" \
       > "$resdir/jplag_clustered_by_group.log"
 set -eo pipefail
-"$SCRIPTDIR"/report_jplag.py -g \
+printf 'report -g %q %q\n' \
   "$resdir/jplag_clustered_by_group.log" \
-  "$resdir/jplag_clustered_by_group.zip"
+  "$resdir/jplag_clustered_by_group.zip" \
+    >> "$resdir/report_jobs.txt"
 if $verbose; then
   echo "  done"
 fi
@@ -277,9 +378,30 @@ set +eo pipefail
     "$resdir/jplag_clustered_all_src" \
       > "$resdir/jplag_clustered_all.log"
 set -eo pipefail
-"$SCRIPTDIR"/report_jplag.py -s 0.3 \
+printf 'report -s 0.3 %q %q\n' \
   "$resdir/jplag_clustered_all.log" \
-  "$resdir/jplag_clustered_all.zip"
+  "$resdir/jplag_clustered_all.zip" \
+    >> "$resdir/report_jobs.txt"
+if $verbose; then
+  echo "  done"
+fi
+
+echoverbose -n "  * step 3: writing JPLAG reports ..."
+# all the report jobs are run even if one fails, then the script stops
+report_status=0
+cms_check_plagiarism batch < "$resdir/report_jobs.txt" || report_status=$?
+if [ "$report_status" -ne 0 ]; then
+  (>&2 echo "Error: some JPLAG reports were not written:")
+  for areport in jplag_all_src jplag_clustered_by_group jplag_clustered_all
+  do
+    for asuffix in _report.csv _clusters_report.csv; do
+      if [ ! -f "$resdir/$areport$asuffix" ]; then
+        (>&2 echo "    - $resdir/$areport$asuffix")
+      fi
+    done
+  done
+  exit "$report_status"
+fi
 if $verbose; then
   echo "  done"
 fi
@@ -287,7 +409,7 @@ fi
 
 echo "Done!"
 echo "1. sherlock results in:"
-echo "    - ${resdir}/plagiarism_report.sherlock.txt"
+echo "    - ${resdir}/${SHERLOCK_REPORT}"
 echo "2. JPLAG results in:"
 echo "    - ${resdir}/jplag_all_src_report.csv"
 echo "    - ${resdir}/jplag_all_src_clusters_report.csv"
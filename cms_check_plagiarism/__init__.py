@@ -0,0 +1,9 @@
+"""
+Plagiarism check for CMS contests.
+
+The package exposes the helper scripts used by ``check_plagiarism.sh`` as
+subcommands of a single entry point, see ``python3 -m cms_check_plagiarism
+--help``. Subcommand modules are imported only when they are run.
+"""
+
+__version__ = '0.4'
@@ -0,0 +1,270 @@
+"""
+Single entry point for the plagiarism check helpers.
+
+Usage:
+  python3 -m cms_check_plagiarism report [-g] [-o OUTPUT] [-s SIMILARITY]
+                                         JPLAG_LOG JPLAG_RESULTS
+  python3 -m cms_check_plagiarism cluster JPLAG_LOG SOURCES_DIR
+  python3 -m cms_check_plagiarism list-groups JPLAG_REPORT
+  python3 -m cms_check_plagiarism shard plan [-b BLOCK_SIZE] [--copy]
+                                             SOURCES_DIR SHARDS_DIR
+  python3 -m cms_check_plagiarism shard partial [-g]
+                                                JPLAG_LOG JPLAG_RESULTS PARTIAL
+  python3 -m cms_check_plagiarism shard merge [-g] [-s SIMILARITY] -o OUTPUT
+                                              PARTIAL [PARTIAL ...]
+  python3 -m cms_check_plagiarism sort-pairs [-f FLOOR] [-m MEMORY] [-T TMPDIR]
+                                             [-o OUTPUT] [--gzip] [PAIRS]
+  python3 -m cms_check_plagiarism batch < JOBS
+
+The batch subcommand reads one job per line from stdin, each job is a
+subcommand with its arguments (quoted as in a shell), and runs all of them
+in the same interpreter. Empty lines and lines starting with '#' are
+ignored. Since stdin is the job list, jobs cannot read their input from
+stdin, e.g. sort-pairs needs PAIRS.
+
+Each subcommand module is imported only when the subcommand is run, and
+only once per interpreter.
+"""
+import sys
+import shlex
+import traceback
+import pathlib
+import argparse
+import importlib
+
+from . import __version__
+from .pathtype import PathType
+from .pathtype import PartialType
+
+# subcommand -> module implementing it, the module must define main(args)
+SUBCOMMANDS = {
+    'report': 'report',
+    'cluster': 'cluster',
+    'list-groups': 'list_groups',
+    'shard': 'shard',
+    'sort-pairs': 'sherlock',
+    }
+
+# subcommand -> argument that reads from stdin when it is '-'
+STDIN_ARGS = {
+    'sort-pairs': 'PAIRS',
+    }
+
+
+def positive_int(string):
+    value = int(string)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1: '%s'" % string)
+
+    return value
+
+
+# parse CLI args with argparse
+def cli_parser():
+    parser = argparse.ArgumentParser(prog='cms_check_plagiarism')
+    parser.add_argument('--version',
+                        action='version',
+                        version='%(prog)s ' + __version__)
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report = subparsers.add_parser(
+        'report',
+        help="Write similarity and cluster reports from JPLAG results.")
+    report.add_argument('JPLAG_LOG',
+                        type=PathType(exists=True, type='file'),
+                        help='Jplag log file.')
+    report.add_argument('JPLAG_RESULTS',
+                        type=PathType(exists=True, type='file'),
+                        help='Jplag results in zip format.')
+    report.add_argument('-g', '--grouped',
+                        action='store_true',
+                        help="Submissions are analyzed grouped.")
+    report.add_argument('-o', '--output',
+                        type=pathlib.Path,
+                        default=None,
+                        help="Base name for report fiiles "
+                             "[default: JPLAG_LOG].")
+    report.add_argument('-s', '--similarity',
+                        type=float,
+                        default=None,
+                        help="Similarity threshold [default: 0.33].")
+
+    cluster = subparsers.add_parser(
+        'cluster',
+        help="Select representative sources from JPLAG clusters.")
+    cluster.add_argument("JPLAG_LOG",
+                         type=PathType(exists=True, type='file'),
+                         help="Jplag log file.")
+    cluster.add_argument("SOURCES_DIR",
+                         type=PathType(exists=True, type='dir'),
+                         help="Directory with submissions sources.")
+
+    list_groups = subparsers.add_parser(
+        'list-groups',
+        help="List similarity between groups from a Jplag report.")
+    list_groups.add_argument("JPLAG_REPORT",
+                             help="Jplag clean report file.")
+
+    shard = subparsers.add_parser(
+        'shard',
+        help="Split a comparison in independent jobs and merge the results.")
+    shard_subparsers = shard.add_subparsers(dest='shard_command',
+                                            required=True)
+
+    shard_plan = shard_subparsers.add_parser(
+        'plan',
+        help="Create a directory for each job and list them.")
+    shard_plan.add_argument('SOURCES_DIR',
+                            type=PathType(exists=True, type='dir'),
+                            help="Directory with a subdirectory for each "
+                                 "participant.")
+    shard_plan.add_argument('SHARDS_DIR',
+                            type=PathType(exists=None, type='dir'),
+                            help="Directory where the jobs are created.")
+    shard_plan.add_argument('-b', '--block-size',
+                            type=positive_int,
+                            default=100,
+                            help="Number of participants in each block "
+                                 "[default: 100].")
+    shard_plan.add_argument('--copy',
+                            action='store_true',
+                            help="Copy the sources in each job directory, "
+                                 "instead of linking them.")
+
+    shard_partial = shard_subparsers.add_parser(
+        'partial',
+        help="Reduce the JPLAG results of a job to a partial results file.")
+    shard_partial.add_argument('JPLAG_LOG',
+                               type=PathType(exists=True, type='file'),
+                               help='Jplag log file.')
+    shard_partial.add_argument('JPLAG_RESULTS',
+                               type=PathType(exists=True, type='file'),
+                               help='Jplag results in zip format.')
+    shard_partial.add_argument('PARTIAL',
+                               type=pathlib.Path,
+                               help="Base name for the partial results, "
+                                    "PARTIAL.log and PARTIAL.zip.")
+    shard_partial.add_argument('-g', '--grouped',
+                               action='store_true',
+                               help="Submissions are analyzed grouped.")
+
+    shard_merge = shard_subparsers.add_parser(
+        'merge',
+        help="Write the reports from the partial results of all jobs.")
+    shard_merge.add_argument('PARTIAL',
+                             type=PartialType(),
+                             nargs='+',
+                             help="Base name of partial results "
+                                  "(PARTIAL.log or PARTIAL.zip are accepted "
+                                  "too).")
+    shard_merge.add_argument('-o', '--output',
+                             type=pathlib.Path,
+                             required=True,
+                             help="Base name for report files.")
+    shard_merge.add_argument('-g', '--grouped',
+                             action='store_true',
+                             help="Submissions are analyzed grouped.")
+    shard_merge.add_argument('-s', '--similarity',
+                             type=float,
+                             default=None,
+                             help="Similarity threshold [default: 0.33].")
+
+    sort_pairs = subparsers.add_parser(
+        'sort-pairs',
+        help="Sort the Sherlock all pairs output by similarity.")
+    sort_pairs.add_argument('PAIRS',
+                            type=PathType(exists=True, type='file'),
+                            nargs='?',
+                            default='-',
+                            help="Output of allpairs.rb [default: stdin].")
+    sort_pairs.add_argument('-f', '--floor',
+                            type=float,
+                            default=1.0,
+                            help="Drop pairs with a similarity below FLOOR "
+                                 "[default: 1].")
+    sort_pairs.add_argument('-m', '--memory',
+                            type=positive_int,
+                            default=64,
+                            help="Memory budget in MiB, sorted runs are "
+                                 "spilled to disk above it [default: 64].")
+    sort_pairs.add_argument('-T', '--tmpdir',
+                            type=PathType(exists=True, type='dir'),
+                            default=None,
+                            help="Directory for the sorted runs "
+                                 "[default: system temporary directory].")
+    sort_pairs.add_argument('-o', '--output',
+                            type=PathType(exists=None, type='file'),
+                            default='-',
+                            help="Output file [default: stdout].")
+    sort_pairs.add_argument('--gzip',
+                            action='store_true',
+                            help="Compress the output with gzip (implied "
+                                 "if OUTPUT ends with .gz).")
+
+    subparsers.add_parser(
+        'batch',
+        help="Run the subcommands listed on stdin, one per line.")
+
+    return parser
+
+
+def run(argv, parser=None, stdin_taken=False):
+    if parser is None:
+        parser = cli_parser()
+
+    args = parser.parse_args(argv)
+    if args.command == 'batch':
+        return batch(sys.stdin, parser)
+
+    stdin_arg = STDIN_ARGS.get(args.command)
+    if stdin_taken and stdin_arg and str(getattr(args, stdin_arg)) == '-':
+        parser.error("argument {}: standard input (-) not allowed in batch, "
+                     "it is the job list".format(stdin_arg))
+
+    module = importlib.import_module('.' + SUBCOMMANDS[args.command],
+                                     __package__)
+    return module.main(args)
+
+
+def batch(jobs, parser):
+    retcode = 0
+    for lineno, line in enumerate(jobs, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        # a bad job must not stop the other ones: argparse exits on invalid
+        # arguments, any other error is reported with its traceback
+        try:
+            argv = shlex.split(line)
+            if argv[0] == 'batch':
+                print("Error: nested batch on line {}".format(lineno),
+                      file=sys.stderr)
+                retcode = retcode or 1
+                continue
+
+            job_retcode = run(argv, parser, stdin_taken=True)
+        except SystemExit as exc:
+            job_retcode = exc.code
+        except Exception:
+            print("Error: job on line {} failed:".format(lineno),
+                  file=sys.stderr)
+            traceback.print_exc()
+            job_retcode = 1
+
+        sys.stdout.flush()
+        if job_retcode:
+            print("Error: job on line {} exited with {}"
+                  .format(lineno, job_retcode),
+                  file=sys.stderr)
+            retcode = retcode or job_retcode
+
+    return retcode
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    return run(argv)
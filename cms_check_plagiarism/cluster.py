@@ -0,0 +1,83 @@
+"""
+Select representative sources of a participant from JPLAG clusters.
+"""
+import re
+
+from .jplag_log import read_log
+from .jplag_log import parse_clusters
+
+SIMILARITY_THRESHOLD = 0.9
+
+# regexes
+SRC_PARAM_REGEX = re.compile(r'sub[0-9]+_([0-9]+)_([0-9\.]+)_\..+')
+
+
+def select_cluster_members(cluster):
+    avg_similarity = cluster['avg_similarity']
+    members_list = sorted(cluster['members'])
+
+    members = []
+    for member in members_list:
+
+        sp_match = SRC_PARAM_REGEX.match(member)
+        assert sp_match is not None
+
+        nsub = int(sp_match.group(1))
+        score = float(sp_match.group(2))
+
+        members.append((score, nsub, member))
+
+    # sort by score and then nsub
+    members.sort()
+
+    selected_sources = members_list
+    if avg_similarity >= SIMILARITY_THRESHOLD:
+        # get the first element that has a score greater than 0
+        #   https://noclick.dev/get-first-item
+        # if all the elements have score 0, then take the first one, i.e.
+        # the earlier sub
+        first_match = next(
+            (m for m in members if m[0] > 0),
+            members[0]
+        )
+        selected_sources = [first_match[2]]
+    else:
+        selected_sources = [m[2] for m in members]
+
+    return selected_sources
+
+
+def select_sources(files, clusters):
+    all_sources = set(f.name for f in files)
+
+    selected_sources = set()
+    all_clusters_members = set()
+    for cl in clusters:
+        sel_sources = select_cluster_members(cl)
+        selected_sources.update(set(sel_sources))
+
+        all_clusters_members.update(cl['members'])
+
+    # all selected sources contains:
+    #  - all sources that are not part of a cluster
+    #      (all_sources - all_clusters_members)
+    #  - the sources selected as representatives of a cluster
+    all_selected_sources = (all_sources
+                            .difference(all_clusters_members)
+                            .union(selected_sources))
+
+    # retrieve the path of the selected soruces
+    all_selected_files = sorted(f for f in files
+                                if f.name in all_selected_sources)
+
+    return all_selected_files
+
+
+def main(args):
+    files = [file for file in args.SOURCES_DIR.iterdir()]
+    clusters = parse_clusters(read_log(args.JPLAG_LOG))
+
+    for selected_file in select_sources(files, clusters):
+        print(selected_file)
+
+    return 0
@@ -0,0 +1,43 @@
+import re
+
+# regexes
+CLUSTERING_REGEX = re.compile(
+    r'^.+ \[main\] \[INFO\] ClusteringFactory - .+$'
+    )
+NCLUSTERS_REGEX = re.compile(
+    r'^.+ \[main\] \[INFO\] ClusteringFactory - ([0-9]+) clusters were found:$'
+    )
+CLUSTERS_PARAM_REGEX = re.compile(
+    r'^.+ \[main\] \[INFO\] ClusteringFactory -  cluster strength: ([0-9\.E\-]+), '
+    r'avg similarity: ([0-9\.E\-]+)%, members: \[(.+)\]$'
+    )
+
+
+def read_log(jplag_log):
+    with jplag_log.open('r') as logfp:
+        log_data = [line.strip() for line in logfp.readlines()]
+
+    return log_data
+
+
+# parse cluster data from JPLAG logs
+def parse_clusters(log_data):
+    clusters = []
+    for line in log_data:
+        if CLUSTERING_REGEX.match(line):
+
+            nclusters_match = NCLUSTERS_REGEX.match(line)
+            if not nclusters_match:
+                cp_match = CLUSTERS_PARAM_REGEX.match(line)
+                if cp_match:
+                    cl_strength = float(cp_match.group(1))
+                    cl_avg_similarity = float(cp_match.group(2))
+                    cl_members = set(cm.strip() for cm
+                                     in cp_match.group(3).strip().split(','))
+
+                    clusters.append({'strength': cl_strength,
+                                     'avg_similarity': cl_avg_similarity,
+                                     'members': cl_members
+                                     })
+
+    return clusters
@@ -0,0 +1,86 @@
+import os
+import pathlib
+
+from argparse import ArgumentTypeError
+
+
+class PathType(object):
+    def __init__(self, exists=True, type='file', dash_ok=True):
+        '''exists:
+             - True: a path that does exist
+             - False: a path that does not exist, in a valid parent directory
+             - None: don't care
+           type: file, dir, symlink, None, or a function returning:
+             - True for valid paths
+             - None: don't care
+           dash_ok: whether to allow "-" as stdin/stdout'''
+
+        assert exists in (True, False, None)
+        assert (type in ('file', 'dir', 'symlink', None) or
+                hasattr(type, '__call__'))
+
+        self._exists = exists
+        self._type = type
+        self._dash_ok = dash_ok
+
+    def __call__(self, string):
+        if string == '-':
+            # the special argument "-" means sys.std{in,out}
+            if self._type == 'dir':
+                raise ArgumentTypeError('standard input/output (-) not allowed as directory path')
+            elif self._type == 'symlink':
+                raise ArgumentTypeError('standard input/output (-) not allowed as symlink path')
+            elif not self._dash_ok:
+                raise ArgumentTypeError('standard input/output (-) not allowed')
+        else:
+            e = os.path.exists(string)
+            # don't care: an existing path must still be of the right type
+            if self._exists or (self._exists is None and e):
+                if not e:
+                    raise ArgumentTypeError("path does not exist: '%s'" % string)
+
+                if self._type is None:
+                    pass
+                elif self._type == 'file':
+                    if not os.path.isfile(string):
+                        raise ArgumentTypeError("path is not a file: '%s'" % string)
+                elif self._type == 'symlink':
+                    if not os.path.islink(string):
+                        raise ArgumentTypeError("path is not a symlink: '%s'" % string)
+                elif self._type == 'dir':
+                    if not os.path.isdir(string):
+                        raise ArgumentTypeError("path is not a directory: '%s'" % string)
+                elif not self._type(string):
+                    raise ArgumentTypeError("path not valid: '%s'" % string)
+            else:
+                if self._exists is False and e:
+                    raise ArgumentTypeError("path exists: '%s'" % string)
+
+                p = os.path.dirname(os.path.normpath(string)) or '.'
+                if not os.path.isdir(p):
+                    raise ArgumentTypeError("parent path is not a directory: '%s'" % p)
+                elif not os.path.exists(p):
+                    raise ArgumentTypeError("parent directory does not exist: '%s'" % p)
+
+        return pathlib.Path(string)
+
+
+class PartialType(object):
+    '''Base name of a partial results file, i.e. PARTIAL.log and PARTIAL.zip.
+       PARTIAL.log or PARTIAL.zip are accepted too, so that a glob like
+       partial_* can be used.'''
+
+    SUFFIXES = ('.log', '.zip')
+
+    def __call__(self, string):
+        partial = pathlib.Path(string)
+        if partial.suffix in self.SUFFIXES:
+            partial = partial.with_suffix('')
+
+        for suffix in self.SUFFIXES:
+            filename = partial.with_name(partial.name + suffix)
+            if not filename.is_file():
+                raise ArgumentTypeError("partial results file does not "
+                                        "exist: '%s'" % filename)
+
+        return partial
@@ -0,0 +1,319 @@
+"""
+Write the similarity and cluster reports from JPLAG results.
+"""
+import csv
+import copy
+import json
+import re
+import zipfile
+
+from collections import namedtuple
+
+from .jplag_log import read_log
+from .jplag_log import parse_clusters
+
+# globals
+CLUSTER_SIMILARITY_THRESHOLD = 0.5
+
+# named tuples
+Source = namedtuple('Source',
+                    ['name', 'gid', 'nsub', 'score', 'ext']
+                    )
+Comparison = namedtuple('Comparison',
+                        ['source1', 'source2', 'name']
+                        )
+GroupComparison = namedtuple('GroupComparison',
+                             ['gid1', 'gid2', 'name']
+                             )
+MatchingGroups = namedtuple('MatchingGroups',
+                            ['gid1', 'gid2', 'similarity', 'filename']
+                            )
+
+# regexes
+# --- example: sub77_8_95.0_.cpp-sub81_4_75.0_.cpp.json
+FNAME_REGEX = re.compile(
+    r'sub([0-9]+)_([0-9]+)_([0-9\.]+|None)_(\..+)'
+    )
+
+FNAME_SINGLESUB_REGEX = re.compile(
+    rf'({FNAME_REGEX.pattern})-({FNAME_REGEX.pattern}).json'
+    )
+FNAME_GROUPED_REGEX = re.compile(
+    r'([0-9]+)-([0-9]+).json'
+    )
+
+
+# Read the files of a zip archive one at a time, yielding the similarity of
+# each comparison
+def iter_zip_similarity(zip_file, exclude=[]):
+    with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+        # get a list of all the files in the zip file
+        file_list = zip_ref.namelist()
+
+        # iterate over the file list and parse each file that is not in the
+        # exclude list
+        for file_name in file_list:
+            if file_name not in exclude:
+                file_contents = json.loads(zip_ref.read(file_name))
+                yield file_name, file_contents['similarity']
+
+
+def parse_name_singlesub(filename):
+    match = FNAME_SINGLESUB_REGEX.match(filename)
+
+    # match should not be None and it should contain 10 groups
+    assert match and len(match.groups()) == 10, \
+        "Filename did not match regex"
+
+    groups = match.groups()
+
+    name1, name2 = groups[0], groups[5]
+    gid1, gid2 = int(groups[1]), int(groups[6])
+    nsub1, nsub2 = int(groups[2]), int(groups[7])
+
+    # score can be None
+    score1 = float(groups[3]) if groups[3] != 'None' else None
+    score2 = float(groups[8]) if groups[8] != 'None' else None
+    ext1, ext2 = groups[4], groups[9]
+
+    comp = Comparison(Source(name1, gid1, nsub1, score1, ext1),
+                      Source(name2, gid2, nsub2, score2, ext2),
+                      filename)
+
+    return comp
+
+
+def parse_name_grouped(filename):
+    match = FNAME_GROUPED_REGEX.match(filename)
+
+    # match should not be None and it should contain 2 groups
+    assert match and len(match.groups()) == 2, \
+        "Filename did not match regex"
+
+    gid1, gid2 = match.groups()
+    group_comp = GroupComparison(gid1, gid2, filename)
+
+    return group_comp
+
+
+def select_excluded_files(zip_archive, grouped=False):
+    # read zip archive
+    with zipfile.ZipFile(zip_archive, 'r') as archive:
+        archive_filenames = archive.namelist()
+
+    # keep the json files (i.e. they end with '.json')
+    # also, ignore the overview.json file
+    all_results_filenames = set(
+        f for f in archive_filenames
+        if f.endswith('.json') and f != 'overview.json'
+        )
+
+    # parse file names
+    parsed_results_names = {}
+    for filename in all_results_filenames:
+        if not grouped:
+            parsed_results_names[filename] = parse_name_singlesub(filename)
+
+    # exclude same group comparisons
+    same_group_filenames = set()
+    if not grouped:
+        for filename in all_results_filenames:
+            comparison = parsed_results_names[filename]
+            if comparison.source1.gid == comparison.source2.gid:
+                same_group_filenames.add(comparison.name)
+
+    excluded_filenames = (set(archive_filenames)
+                          .difference(all_results_filenames)
+                          .union(same_group_filenames)
+                          )
+
+    return excluded_filenames
+
+
+def extract_comparisons(zip_archive, grouped=False):
+    excluded_filenames = select_excluded_files(zip_archive,
+                                               grouped=grouped)
+
+    return iter_zip_similarity(zip_archive, exclude=excluded_filenames)
+
+
+def select_max_similarity_between_groups(comparisons, grouped=False,
+                                         parsed_comparisons=None):
+    # keep the comparison with the highest similarity for each pair of
+    # groups, ties are broken by filename so that the result does not depend
+    # on the order of the comparisons.
+    # An existing table can be passed as parsed_comparisons to update it.
+    if parsed_comparisons is None:
+        parsed_comparisons = {}
+
+    for filename, similarity in comparisons:
+        if not grouped:
+            comp = parse_name_singlesub(filename)
+
+            # group with the smaller id first
+            gid1 = comp.source1.gid
+            gid2 = comp.source2.gid
+            key = (gid1, gid2) if gid1 < gid2 else (gid2, gid1)
+        else:
+            comp = parse_name_grouped(filename)
+            gid1 = comp.gid1
+            gid2 = comp.gid2
+            key = (gid1, gid2) if gid1 < gid2 else (gid2, gid1)
+
+        # gid1, gid2, similarity, filename
+        new_mgroups = MatchingGroups(key[0], key[1], similarity, filename)
+
+        old_mgroups = parsed_comparisons.get(key)
+        if old_mgroups is None or \
+                new_mgroups.similarity > old_mgroups.similarity or \
+                (new_mgroups.similarity == old_mgroups.similarity and
+                 new_mgroups.filename < old_mgroups.filename):
+            parsed_comparisons[key] = new_mgroups
+
+    return parsed_comparisons
+
+
+def select_groups(max_similarity, similarity=None):
+    # sort by similarity, then by pair of groups
+    max_similarity_sorted = sorted(max_similarity.values(),
+                                   key=lambda group: (-group.similarity,
+                                                      group.gid1,
+                                                      group.gid2)
+                                   )
+
+    if similarity:
+        selected_groups = [group for group in max_similarity_sorted
+                           if group.similarity > similarity]
+    else:
+        selected_groups = max_similarity_sorted[:10]
+
+    return selected_groups
+
+
+def all_elements_same(lst):
+    if len(lst) == 0:
+        return True
+    first_element = lst[0]
+    for element in lst:
+        if element != first_element:
+            return False
+    return True
+
+
+def select_clusters(clusters, sim_threshold, grouped=False):
+    selected_clusters = []
+    for cluster in clusters:
+        avg_similarity = cluster['avg_similarity']
+        members_list = sorted(cluster['members'])
+
+        members = []
+        if not grouped:
+            for member in members_list:
+                sp_match = FNAME_REGEX.match(member)
+                assert sp_match is not None
+
+                gid = int(sp_match.group(1))
+                nsub = int(sp_match.group(2))
+                score = float(sp_match.group(3))
+
+                members.append((gid, score, nsub, member))
+        else:
+            members = [int(m) for m in members_list]
+
+        # sort by gid, then score and nsub (single subs) or
+        # sort by group
+        members.sort()
+
+        if avg_similarity >= sim_threshold:
+            new_cluster = copy.copy(cluster)
+            # if we are considering single subs, exclude the case where all
+            # the subs come from the same group.
+            if not grouped and \
+                    not all_elements_same([m[0] for m in members]):
+
+                new_cluster['groups'] = sorted(set([m[0] for m in members]))
+                selected_clusters.append(new_cluster)
+
+            if grouped:
+                new_cluster['groups'] = members
+                selected_clusters.append(new_cluster)
+
+    return selected_clusters
+
+
+def report_filename(jplag_log, output, suffix):
+    base = output if output else jplag_log
+
+    return base.with_name(base.stem + suffix)
+
+
+def write_comparisons_report(outfile, selected_groups):
+    with outfile.open('w') as comp_outfp:
+        csvwriter = csv.writer(comp_outfp, delimiter='\t')
+
+        # write header
+        csvwriter.writerow(['gid1', 'gid2', 'similarity', 'filename'])
+
+        for group in selected_groups:
+            csvwriter.writerow(group)
+
+
+def write_clusters_report(outfile, selected_clusters, grouped=False):
+    with outfile.open('w') as clusters_outfp:
+        csvwriter = csv.writer(clusters_outfp, delimiter='\t')
+
+        # write header
+        if not grouped:
+            csvwriter.writerow(['groups', 'strength', 'avg_similarity',
+                                'members'])
+        else:
+            # cluster members are redundant for groups, they are the groups
+            # again
+            csvwriter.writerow(['groups', 'strength', 'avg_similarity'])
+
+        for cluster in selected_clusters:
+            groups = ','.join([str(el) for el in cluster['groups']])
+            strength = cluster['strength']
+            avg_similarity = cluster['avg_similarity']
+
+            if not grouped:
+                members = ','.join([str(el) for el
+                                    in sorted(cluster['members'])])
+                csvwriter.writerow([groups, strength, avg_similarity,
+                                    members])
+            else:
+                csvwriter.writerow([groups, strength, avg_similarity])
+
+
+def write_reports(jplag_log, output, max_similarity, clusters,
+                  similarity=None, grouped=False):
+    selected_groups = select_groups(max_similarity, similarity)
+
+    comp_output_file = report_filename(jplag_log, output, '_report.csv')
+    write_comparisons_report(comp_output_file, selected_groups)
+
+    cluster_similarity = similarity \
+        if similarity else CLUSTER_SIMILARITY_THRESHOLD
+    selected_clusters = select_clusters(clusters,
+                                        cluster_similarity,
+                                        grouped)
+
+    clusters_output_file = report_filename(jplag_log, output,
+                                           '_clusters_report.csv')
+    write_clusters_report(clusters_output_file, selected_clusters,
+                          grouped=grouped)
+
+
+def main(args):
+    log_data = read_log(args.JPLAG_LOG)
+
+    comparisons = extract_comparisons(args.JPLAG_RESULTS,
+                                      grouped=args.grouped)
+    max_similarity = select_max_similarity_between_groups(comparisons,
+                                                          args.grouped)
+    clusters = parse_clusters(log_data)
+
+    write_reports(args.JPLAG_LOG, args.output, max_similarity, clusters,
+                  similarity=args.similarity, grouped=args.grouped)
+
+    return 0
@@ -0,0 +1,192 @@
+"""
+Split a cross-group comparison in independent jobs and merge their results.
+
+The participants (i.e. the subdirectories of the sources directory) are
+split in blocks, there is a job for each pair of blocks. A job runs JPLAG on
+the sources of its two blocks and reduces the results to a partial results
+file with `shard partial`. The partial results are combined in the usual
+`*_report.csv` files with `shard merge`.
+
+A partial results file is a pair of files, PARTIAL.log and PARTIAL.zip, in
+the same format of the JPLAG log and results read by `report`:
+  * PARTIAL.zip contains only the comparison with the highest similarity
+    for each pair of groups;
+  * PARTIAL.log contains only the clusters found by JPLAG.
+
+Pairs of groups in the same block are compared by more than one job, the
+merge step keeps the same comparison as a single run with all the sources.
+Clusters are computed by JPLAG on the sources of each job, the merged report
+lists the clusters found by any job.
+"""
+import re
+import sys
+import shutil
+import zipfile
+
+from .jplag_log import read_log
+from .jplag_log import parse_clusters
+from .jplag_log import CLUSTERING_REGEX
+from .report import extract_comparisons
+from .report import select_max_similarity_between_groups
+from .report import write_reports
+
+# globals
+SHARD_FORMAT = 'shard_{:03d}_{:03d}'
+
+DIGITS_REGEX = re.compile(r'([0-9]+)')
+
+
+# sort names with numbers in natural order, like `sort -V`
+def natural_key(name):
+    return [int(part) if part.isdigit() else part
+            for part in DIGITS_REGEX.split(name)]
+
+
+def split_blocks(participants, block_size):
+    return [participants[i:i+block_size]
+            for i in range(0, len(participants), block_size)]
+
+
+# all pairs of distinct blocks, every pair of participants is in at least one
+# of them. With a single block there is a single job.
+def block_pairs(nblocks):
+    if nblocks == 1:
+        return [(0, 0)]
+
+    return [(i, j) for i in range(nblocks) for j in range(i+1, nblocks)]
+
+
+def list_participants(sources_dir):
+    return sorted((d for d in sources_dir.iterdir() if d.is_dir()),
+                  key=lambda d: natural_key(d.name))
+
+
+def remove_path(path):
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+# the job directories link to the sources with absolute paths, to run a job
+# on another machine without a shared filesystem either copy them
+# dereferencing the links (`cp -L`, `rsync -L`) or plan with copy=True.
+def plan(participants, shards_dir, block_size, copy=False):
+    blocks = split_blocks(participants, block_size)
+
+    shard_dirs = []
+    for i, j in block_pairs(len(blocks)):
+        shard_dir = shards_dir / SHARD_FORMAT.format(i, j)
+        shard_dir.mkdir(parents=True, exist_ok=True)
+
+        # a plan can be run again in the same directory
+        for entry in shard_dir.iterdir():
+            remove_path(entry)
+
+        members = blocks[i] if i == j else blocks[i] + blocks[j]
+        for participant in members:
+            if copy:
+                shutil.copytree(participant, shard_dir / participant.name)
+            else:
+                (shard_dir / participant.name).symlink_to(
+                    participant.resolve(), target_is_directory=True)
+        shard_dirs.append(shard_dir)
+
+    return shard_dirs
+
+
+def partial_filenames(partial):
+    return (partial.with_name(partial.name + '.log'),
+            partial.with_name(partial.name + '.zip'))
+
+
+def write_partial(partial, log_data, jplag_results, max_similarity):
+    partial_log, partial_zip = partial_filenames(partial)
+
+    with partial_log.open('w') as logfp:
+        for line in log_data:
+            if CLUSTERING_REGEX.match(line):
+                logfp.write(line + '\n')
+
+    # copy the selected comparisons as they are
+    selected_filenames = sorted(group.filename
+                                for group in max_similarity.values())
+    with zipfile.ZipFile(jplag_results, 'r') as zip_ref, \
+            zipfile.ZipFile(partial_zip, 'w',
+                            compression=zipfile.ZIP_DEFLATED) as partial_ref:
+        for filename in selected_filenames:
+            partial_ref.writestr(filename, zip_ref.read(filename))
+
+
+def unique_clusters(clusters):
+    seen = set()
+    selected_clusters = []
+    for cluster in clusters:
+        key = (cluster['strength'],
+               cluster['avg_similarity'],
+               frozenset(cluster['members']))
+        if key not in seen:
+            seen.add(key)
+            selected_clusters.append(cluster)
+
+    return selected_clusters
+
+
+def main_plan(args):
+    participants = list_participants(args.SOURCES_DIR)
+    if not participants:
+        print("Error: no participants in '{}'".format(args.SOURCES_DIR),
+              file=sys.stderr)
+        return 1
+
+    for shard_dir in plan(participants, args.SHARDS_DIR, args.block_size,
+                          copy=args.copy):
+        print(shard_dir)
+
+    return 0
+
+
+def main_partial(args):
+    log_data = read_log(args.JPLAG_LOG)
+
+    comparisons = extract_comparisons(args.JPLAG_RESULTS,
+                                      grouped=args.grouped)
+    max_similarity = select_max_similarity_between_groups(comparisons,
+                                                          args.grouped)
+
+    write_partial(args.PARTIAL, log_data, args.JPLAG_RESULTS,
+                  max_similarity)
+
+    return 0
+
+
+def main_merge(args):
+    # a glob matches both PARTIAL.log and PARTIAL.zip
+    partials = list(dict.fromkeys(args.PARTIAL))
+
+    max_similarity = {}
+    log_data = []
+    for partial in partials:
+        partial_log, partial_zip = partial_filenames(partial)
+
+        comparisons = extract_comparisons(partial_zip, grouped=args.grouped)
+        select_max_similarity_between_groups(
+            comparisons, args.grouped, parsed_comparisons=max_similarity)
+
+        log_data.extend(read_log(partial_log))
+
+    clusters = unique_clusters(parse_clusters(log_data))
+
+    write_reports(args.output, args.output, max_similarity, clusters,
+                  similarity=args.similarity, grouped=args.grouped)
+
+    return 0
+
+
+def main(args):
+    if args.shard_command == 'plan':
+        return main_plan(args)
+    elif args.shard_command == 'partial':
+        return main_partial(args)
+    else:
+        return main_merge(args)
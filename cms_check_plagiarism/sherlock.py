@@ -0,0 +1,170 @@
+"""
+Sort the output of allpairs.rb by similarity with bounded memory.
+
+Each line starts with the similarity of a pair of groups, e.g.:
+  45% sub1_2_30.0_.cpp sub5_1_100.0_.cpp: 1 5
+
+Pairs with no match are written as ' 1 5', without a similarity.
+
+Lines with a similarity below the floor are dropped. The other ones are
+kept in memory until they would exceed the memory budget (which also covers
+the sort keys, not the interpreter itself), then they are sorted and
+spilled to a run on disk, in a temporary directory removed at the end (also
+on errors). Runs are merged (at most MAX_FANIN at a time) in
+the final report, sorted by decreasing similarity like `sort -n -r` with
+LC_ALL=C.
+"""
+import io
+import os
+import re
+import sys
+import gzip
+import heapq
+import tempfile
+
+# globals
+MAX_FANIN = 64
+
+# approximate memory used by a line kept in the buffer, on top of its length:
+# the str object and its slot in the buffer (~60 bytes), plus the
+# (float, str) key built for each line when the buffer is sorted (~90 bytes)
+LINE_OVERHEAD = 160
+# the buffer is spilled at this fraction of the memory budget, the rest is
+# left to the temporary arrays of the sort and to the allocator
+BUFFER_FRACTION = 0.75
+
+# leading number, as parsed by `sort -n`
+SCORE_REGEX = re.compile(r'^\s*(-?[0-9]*(?:\.[0-9]*)?)')
+# similarity reported by sherlock
+SIMILARITY_REGEX = re.compile(r'^([0-9]+(?:\.[0-9]*)?)%')
+
+
+def parse_score(line):
+    match = SCORE_REGEX.match(line)
+    try:
+        return float(match.group(1))
+    except ValueError:
+        # lines without a leading number, e.g. pairs with no match
+        return 0.0
+
+
+def parse_similarity(line):
+    match = SIMILARITY_REGEX.match(line)
+    if match is None:
+        return 0.0
+
+    return float(match.group(1))
+
+
+# sort by decreasing score, ties by decreasing line (the last resort
+# comparison of `sort -r`)
+def sort_key(line):
+    return (parse_score(line), line)
+
+
+def open_output(output, compress=False):
+    if str(output) == '-':
+        if compress:
+            # closing the GzipFile does not close stdout
+            return io.TextIOWrapper(
+                gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'))
+        return sys.stdout
+    elif compress:
+        return gzip.open(output, 'wt')
+    else:
+        return open(output, 'w')
+
+
+def write_run(lines, rundir):
+    fd, run_file = tempfile.mkstemp(suffix='.run', dir=rundir)
+    with os.fdopen(fd, 'w') as runfp:
+        runfp.writelines(lines)
+
+    return run_file
+
+
+def merge_runs(run_files, outfp):
+    runfps = [open(run_file, 'r') for run_file in run_files]
+    try:
+        outfp.writelines(heapq.merge(*runfps, key=sort_key, reverse=True))
+    finally:
+        for runfp in runfps:
+            runfp.close()
+
+    for run_file in run_files:
+        os.remove(run_file)
+
+
+# merge the runs until there are at most MAX_FANIN of them, so that the
+# number of open files is bounded
+def reduce_runs(run_files, rundir):
+    while len(run_files) > MAX_FANIN:
+        new_run_files = []
+        for i in range(0, len(run_files), MAX_FANIN):
+            fd, run_file = tempfile.mkstemp(suffix='.run', dir=rundir)
+            with os.fdopen(fd, 'w') as runfp:
+                merge_runs(run_files[i:i+MAX_FANIN], runfp)
+            new_run_files.append(run_file)
+
+        run_files = new_run_files
+
+    return run_files
+
+
+def sort_pairs(pairs, outfp, floor=1.0, memory=64*1024*1024, tmpdir=None):
+    buffer = []
+    buffer_size = 0
+    buffer_limit = memory * BUFFER_FRACTION
+    run_files = []
+    # all the runs, intermediate ones included, are in rundir
+    with tempfile.TemporaryDirectory(prefix='sort_pairs.',
+                                     dir=tmpdir) as rundir:
+        for line in pairs:
+            if parse_similarity(line) < floor:
+                continue
+
+            if not line.endswith('\n'):
+                line = line + '\n'
+
+            buffer.append(line)
+            buffer_size += len(line) + LINE_OVERHEAD
+            if buffer_size > buffer_limit:
+                buffer.sort(key=sort_key, reverse=True)
+                run_files.append(write_run(buffer, rundir))
+                buffer = []
+                buffer_size = 0
+
+        buffer.sort(key=sort_key, reverse=True)
+        if not run_files:
+            outfp.writelines(buffer)
+            return
+
+        run_files.append(write_run(buffer, rundir))
+        buffer = []
+
+        run_files = reduce_runs(run_files, rundir)
+        merge_runs(run_files, outfp)
+
+
+def main(args):
+    compress = args.gzip or str(args.output).endswith('.gz')
+
+    pairsfp = sys.stdin
+    if str(args.PAIRS) != '-':
+        pairsfp = open(args.PAIRS, 'r')
+
+    outfp = open_output(args.output, compress=compress)
+    try:
+        sort_pairs(pairsfp, outfp,
+                   floor=args.floor,
+                   memory=args.memory*1024*1024,
+                   tmpdir=args.tmpdir)
+    finally:
+        if pairsfp is not sys.stdin:
+            pairsfp.close()
+        if outfp is not sys.stdout:
+            outfp.close()
+        else:
+            outfp.flush()
+
+    return 0